@@ -1,5 +1,4 @@
+from ._version import __version__
 from .listener import handler
 
-__version__ = "0.1.2-pre.6+2559c07"
-
 __all__ = ["handler"]
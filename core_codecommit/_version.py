@@ -0,0 +1 @@
+__version__ = "0.1.2-pre.6+2559c07"
@@ -10,13 +10,112 @@ Usage example:
 """
 
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Any
 
 import core_logging as log
 import core_framework as util
 from core_framework.models import DeploymentDetails
 
+from ._version import __version__
+
+# Upper bound on records processed concurrently. The client connection pool is
+# sized to match so worker threads never wait on a free connection.
+_MAX_WORKERS = 16
+
+# Keep connections alive between calls so successive SSM and CodeBuild requests
+# reuse the same TLS session. Adaptive retries back off (with jitter) when
+# PutParameter is throttled during a burst of commits.
+_CLIENT_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=_MAX_WORKERS,
+    retries={"max_attempts": 10, "mode": "adaptive"},
+    connect_timeout=3,
+    read_timeout=10,
+)
+
+# Environment variables passed to CodeBuild, in order. Values are supplied by
+# invoke_codebuild_project in the same order.
+_ENV_VAR_NAMES = (
+    "CLIENT",
+    "PORTFOLIO",
+    "APP",
+    "BRANCH",
+    # core-* repos are always build 1 - there's no blue/green for the foundations, just stack updates.
+    "BUILD",
+    "BUILD_NUMBER",
+    # Env var set in deploy.sh
+    "BUCKET_NAME",
+)
+
+# A commit re-triggered within this window reuses the build already started
+# for it instead of writing a new build number and starting another build.
+_BUILD_REUSE_MS = 1000
+
+# PutParameter errors that mean "try again later" rather than a real failure;
+# they are re-raised so the invocation is retried.
+_THROTTLING_ERROR_CODES = frozenset({"ThrottlingException", "TooManyUpdates"})
+
+# Last build started per project and branch: {(project_name, branch): (build, started_ms, response)}
+_last_builds: dict[tuple[str, str], tuple[str, int, dict]] = {}
+_last_builds_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _get_region() -> str:
+    """
+    Return the automation region, resolved once per container.
+
+    :returns: The automation region
+    :rtype: str
+    """
+    return util.get_region()
+
+
+@lru_cache(maxsize=1)
+def _get_bucket_name() -> str:
+    """
+    Return the automation bucket name, resolved once per container.
+
+    :returns: The automation bucket name
+    :rtype: str
+    """
+    return util.get_bucket_name()
+
+
+@lru_cache(maxsize=1)
+def _get_ssm_client() -> Any:
+    """
+    Return the SSM client shared by every invocation in this container.
+
+    Client construction loads the botocore service model and is the most expensive
+    part of a warm invocation, so the client is built on first use and reused for
+    every record and every subsequent invocation.
+
+    :returns: Boto3 SSM client
+    :rtype: Any
+    """
+    return boto3.client("ssm", config=_CLIENT_CONFIG)
+
+
+@lru_cache(maxsize=1)
+def _get_codebuild_client() -> Any:
+    """
+    Return the CodeBuild client shared by every invocation in this container.
+
+    The client is bound to the automation region which is resolved once, when
+    the client is first built.
+
+    :returns: Boto3 CodeBuild client
+    :rtype: Any
+    """
+    return boto3.client("codebuild", region_name=_get_region(), config=_CLIENT_CONFIG)
+
 
 def __get_deployment_details(record: dict) -> DeploymentDetails:
     """
@@ -53,14 +152,12 @@ def __get_deployment_details(record: dict) -> DeploymentDetails:
     For multi-part app names (e.g., core-api-gateway), the portfolio is 'core'
     and the app name is 'api-gateway'.
     """
-    # Dashes in repo names can break the first solution.
-    # portfolio, app = record['eventSourceARN'].split(':')[-1].split('-')
-    parts = record["eventSourceARN"].split(":")[-1].split("-")
-    portfolio = parts[0]
-    app = "-".join(parts[1:])
+    # Split on the first dash only; app names may contain dashes themselves.
+    repository = record["eventSourceARN"].rpartition(":")[2]
+    portfolio, _, app = repository.partition("-")
 
     references = record["codecommit"]["references"][0]
-    branch = references["ref"].split("/")[-1]
+    branch = references["ref"].rpartition("/")[2]
     build = references["commit"][:7]
 
     return DeploymentDetails(
@@ -83,7 +180,7 @@ def __get_new_build_number(deployment: DeploymentDetails) -> str:
     :type deployment: DeploymentDetails
     :returns: The version number of the stored parameter (as string)
     :rtype: str
-    :raises ClientError: If SSM parameter operation fails
+    :raises ClientError: If SSM parameter operation fails, including throttling after retries
     :raises Exception: If timestamp generation or parameter storage fails
 
     Examples
@@ -97,14 +194,42 @@ def __get_new_build_number(deployment: DeploymentDetails) -> str:
     Parameter name format: /{portfolio}/{app}/{branch}/build_time
     The parameter value is the current timestamp in milliseconds.
     The returned build number is the parameter version, not the timestamp.
+
+    If PutParameter is still throttled after the client's retries, the error
+    is re-raised and no build is started, so the asynchronous Lambda
+    invocation is retried rather than the build getting an unordered number.
     """
     param_name = "/{}/{}/{}/build_time".format(deployment.portfolio, deployment.app, deployment.branch_short_name)
-    current_time = str(int(round(time.time() * 1000)))
+    current_time = str(time.time_ns() // 1_000_000)
 
-    client = boto3.client("ssm")
-    response = client.put_parameter(Name=param_name, Value=current_time, Type="String", Overwrite=True)
-    log.info("New build number param_name={}, current_time={}, response={}".format(param_name, current_time, response))
-    return str(response["Version"])
+    try:
+        response = _get_ssm_client().put_parameter(Name=param_name, Value=current_time, Type="String", Overwrite=True)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in _THROTTLING_ERROR_CODES:
+            log.warn("PutParameter throttled for {}, leaving the build for the invocation retry", param_name)
+        raise
+
+    version = str(response["Version"])
+    log.info(
+        "New build number",
+        details={"param_name": param_name, "current_time": current_time, "version": version},
+    )
+
+    return version
+
+
+def _env_var(name: str, value: str) -> dict:
+    """
+    Build a plaintext CodeBuild environment variable override.
+
+    :param name: Environment variable name
+    :type name: str
+    :param value: Environment variable value
+    :type value: str
+    :returns: Entry for the start_build environmentVariablesOverride list
+    :rtype: dict
+    """
+    return {"name": name, "value": value, "type": "PLAINTEXT"}
 
 
 def invoke_codebuild_project(dd: DeploymentDetails) -> dict:
@@ -144,6 +269,10 @@ def invoke_codebuild_project(dd: DeploymentDetails) -> dict:
 
     Notes
     -----
+    If the same commit was started on the same project and branch less than a
+    second ago (a re-triggered commit), the response of that build is returned
+    and no new build number is written or build started.
+
     Environment variables set for the build:
         - CLIENT: The client identifier
         - PORTFOLIO: The portfolio name
@@ -159,29 +288,28 @@ def invoke_codebuild_project(dd: DeploymentDetails) -> dict:
     https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/codebuild.html#CodeBuild.Client.start_build
     """
     project_name = "{}-{}".format(dd.portfolio, dd.app)
+    build_key = (project_name, dd.branch)
+    now = time.time_ns() // 1_000_000
+
+    with _last_builds_lock:
+        last = _last_builds.get(build_key)
+    if last is not None:
+        last_build, last_started, last_response = last
+        if last_build == dd.build and now - last_started < _BUILD_REUSE_MS:
+            log.info("Build already started for project: {}, commit: {}", project_name, dd.build)
+            return last_response
+
     build_number = __get_new_build_number(dd)
-    automation_bucket_name = util.get_bucket_name()
-    automation_region = util.get_region()
-
-    log.info("Initiating build for project: {}".format(project_name))
-
-    env_vars = [
-        {"name": "CLIENT", "value": dd.client, "type": "PLAINTEXT"},
-        {"name": "PORTFOLIO", "value": dd.portfolio, "type": "PLAINTEXT"},
-        {"name": "APP", "value": dd.app, "type": "PLAINTEXT"},
-        {"name": "BRANCH", "value": dd.branch, "type": "PLAINTEXT"},
-        # core-* repos are always build 1 - there's no blue/green for the foundations, just stack updates.
-        {"name": "BUILD", "value": dd.build, "type": "PLAINTEXT"},
-        {"name": "BUILD_NUMBER", "value": build_number, "type": "PLAINTEXT"},
-        # Env var set in deploy.sh
-        {"name": "BUCKET_NAME", "value": automation_bucket_name, "type": "PLAINTEXT"},
-    ]
+    automation_bucket_name = _get_bucket_name()
 
-    log.info("Details of Environment:", details=env_vars)
+    log.info("Initiating build for project: {}", project_name)
+
+    values = (dd.client, dd.portfolio, dd.app, dd.branch, dd.build, build_number, automation_bucket_name)
+    env_vars = [_env_var(name, value) for name, value in zip(_ENV_VAR_NAMES, values, strict=True)]
 
-    boto3_client = boto3.client("codebuild", region_name=automation_region)
+    log.info("Details of Environment:", details=env_vars)
 
-    response = boto3_client.start_build(
+    response = _get_codebuild_client().start_build(
         projectName=project_name,
         sourceVersion=dd.branch,
         environmentVariablesOverride=env_vars,
@@ -189,9 +317,40 @@ def invoke_codebuild_project(dd: DeploymentDetails) -> dict:
 
     log.info("response: ", details=response)
 
+    with _last_builds_lock:
+        _last_builds[build_key] = (dd.build, now, response)
+
     return response
 
 
+def _process_deployment(dd: DeploymentDetails) -> dict:
+    """
+    Start the CodeBuild project for a single deployment.
+
+    Deployments are independent of each other, so this function is safe to run
+    concurrently from worker threads.
+
+    :param dd: Deployment details extracted from a CodeCommit event record
+    :type dd: DeploymentDetails
+    :returns: Response from the CodeBuild start_build API call
+    :rtype: dict
+    """
+    log.info(
+        "deployment: client={}, portfolio={}, app={}, branch={}, build={}",
+        dd.client,
+        dd.portfolio,
+        dd.app,
+        dd.branch,
+        dd.build,
+    )
+
+    identity = dd.get_identity()
+
+    log.info("identity={}", identity)
+
+    return invoke_codebuild_project(dd)
+
+
 def handler(event: dict, context: Any) -> dict:
     """
     Handle the event from the CodeCommit trigger.
@@ -239,8 +398,11 @@ def handler(event: dict, context: Any) -> dict:
         - event["Records"]: List of CodeCommit event records
         - Each record contains eventSourceARN and codecommit reference data
 
-    The function processes each record independently and collects all responses.
-    If any individual record fails, the exception is raised and processing stops.
+    Records are processed concurrently on a thread pool and the responses are
+    returned in the same order as the records. Records that resolve to the same
+    portfolio, app, branch and commit start a single build, and each of them
+    receives that build's response. If any individual record fails,
+    the exception is raised once the records already in flight have finished.
 
     Error Handling
     --------------
@@ -251,11 +413,8 @@ def handler(event: dict, context: Any) -> dict:
     All exceptions are logged and re-raised to ensure proper Lambda error handling.
     """
     try:
-        # Get the version of this module
-        from core_codecommit import __version__
-
         log.info(f"Commit Listener Event v{__version__}")
-        log.debug("event={}".format(event))
+        log.debug("event: ", details=event)
 
         if "Records" not in event:
             log.error("No 'Records' key in event")
@@ -263,24 +422,40 @@ def handler(event: dict, context: Any) -> dict:
 
         records = event["Records"]
 
-        log.info("Processing {} Records".format(len(records)))
+        log.info("Processing {} Records", len(records))
 
-        responses: list[dict] = []
+        if not records:
+            return {"Responses": []}
+
+        # Records carrying the same ref and commit for the same repository (e.g. a
+        # trigger delivered twice) would start identical builds, so each is built
+        # only once. Different refs to one commit, such as a branch and a tag,
+        # resolve to different branches and still build separately.
+        keys: list[tuple[str, str, str, str]] = []
+        deployments: dict[tuple[str, str, str, str], DeploymentDetails] = {}
         for record in records:
             dd = __get_deployment_details(record)
+            key = (dd.portfolio, dd.app, dd.branch, dd.build)
+            keys.append(key)
+            if key in deployments:
+                log.info("Skipping duplicate deployment for build {}", dd.build)
+            else:
+                deployments[key] = dd
 
-            log.info("deployment: ", details=dd.model_dump())
-
-            identity = dd.get_identity()
-
-            log.info("identity={}", identity)
+        # Resolve the bucket name and build the shared clients up front. Client
+        # creation on the default boto3 session is not thread-safe (and the
+        # bucket lookup may use it), but the clients themselves are.
+        _get_bucket_name()
+        _get_ssm_client()
+        _get_codebuild_client()
 
-            response = invoke_codebuild_project(dd)
+        with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(deployments))) as executor:
+            results = dict(zip(deployments, executor.map(_process_deployment, deployments.values())))
 
-            responses.append(response)
+        responses: list[dict] = [results[key] for key in keys]
 
         return {"Responses": responses}
 
     except Exception as e:
-        log.error("Error processing CodeCommit event: {}".format(e))  # Fixed: use log.error instead of print
-        raise e
+        log.error("Error processing CodeCommit event: {}", e)
+        raise
@@ -0,0 +1,52 @@
+"""
+Static AWS response payloads shared by the listener tests.
+
+The payloads are built once at import. types.MappingProxyType only makes
+their top level read-only, so tests queue deep copies of them.
+"""
+
+from types import MappingProxyType
+
+START_BUILD_RESPONSE = MappingProxyType(
+    {
+        "build": {
+            "id": "my-build-id",
+            "arn": "arn:aws:codebuild:us-west-2:123456789012:build/my-project:my-build-id",
+            "startTime": "2023-10-01T12:34:56Z",
+            "currentPhase": "SUBMITTED",
+            "buildStatus": "IN_PROGRESS",
+            "sourceVersion": "abcdef1234567890abcdef1234567890abcdef12",
+            "resolvedSourceVersion": "abcdef1234567890abcdef1234567890abcdef12",
+            "projectName": "my-project",
+            "phases": [
+                {
+                    "phaseType": "SUBMITTED",
+                    "phaseStatus": "SUCCEEDED",
+                    "startTime": "2023-10-01T12:34:56Z",
+                    "endTime": "2023-10-01T12:35:00Z",
+                },
+                {
+                    "phaseType": "QUEUED",
+                    "phaseStatus": "IN_PROGRESS",
+                    "startTime": "2023-10-01T12:35:00Z",
+                },
+            ],
+            "source": {
+                "type": "CODECOMMIT",
+                "location": "https://git-codecommit.us-west-2.amazonaws.com/v1/repos/my-repo",
+            },
+            "artifacts": {"location": "arn:aws:s3:::my-artifact-bucket/my-artifact.zip"},
+            "environment": {
+                "type": "LINUX_CONTAINER",
+                "image": "aws/codebuild/standard:4.0",
+                "computeType": "BUILD_GENERAL1_SMALL",
+                "environmentVariables": [{"name": "ENV_VAR_NAME", "value": "value", "type": "PLAINTEXT"}],
+            },
+            "logs": {
+                "groupName": "/aws/codebuild/my-project",
+                "streamName": "my-build-id",
+                "deepLink": "https://console.aws.amazon.com/cloudwatch/home?region=us-west-2#logEvent:group=/aws/codebuild/my-project;stream=my-build-id",
+            },
+        }
+    }
+)
@@ -5,147 +5,247 @@ This module contains pytest test cases for the CodeCommit event handler,
 including mocking of AWS services and validation of deployment processing.
 """
 
-from unittest.mock import patch, MagicMock
+import copy
+from unittest.mock import create_autospec, patch, MagicMock
+import boto3
 import pytest
-import time
-
-from core_codecommit.listener import handler
-
-
-start_build_response = {
-    "build": {
-        "id": "my-build-id",
-        "arn": "arn:aws:codebuild:us-west-2:123456789012:build/my-project:my-build-id",
-        "startTime": "2023-10-01T12:34:56Z",
-        "currentPhase": "SUBMITTED",
-        "buildStatus": "IN_PROGRESS",
-        "sourceVersion": "abcdef1234567890abcdef1234567890abcdef12",
-        "resolvedSourceVersion": "abcdef1234567890abcdef1234567890abcdef12",
-        "projectName": "my-project",
-        "phases": [
-            {
-                "phaseType": "SUBMITTED",
-                "phaseStatus": "SUCCEEDED",
-                "startTime": "2023-10-01T12:34:56Z",
-                "endTime": "2023-10-01T12:35:00Z",
-            },
-            {
-                "phaseType": "QUEUED",
-                "phaseStatus": "IN_PROGRESS",
-                "startTime": "2023-10-01T12:35:00Z",
-            },
-        ],
-        "source": {
-            "type": "CODECOMMIT",
-            "location": "https://git-codecommit.us-west-2.amazonaws.com/v1/repos/my-repo",
-        },
-        "artifacts": {"location": "arn:aws:s3:::my-artifact-bucket/my-artifact.zip"},
-        "environment": {
-            "type": "LINUX_CONTAINER",
-            "image": "aws/codebuild/standard:4.0",
-            "computeType": "BUILD_GENERAL1_SMALL",
-            "environmentVariables": [{"name": "ENV_VAR_NAME", "value": "value", "type": "PLAINTEXT"}],
-        },
-        "logs": {
-            "groupName": "/aws/codebuild/my-project",
-            "streamName": "my-build-id",
-            "deepLink": "https://console.aws.amazon.com/cloudwatch/home?region=us-west-2#logEvent:group=/aws/codebuild/my-project;stream=my-build-id",
+from botocore.exceptions import ClientError
+from botocore.stub import ANY, Stubber
+import datetime as dt
+import time_machine
+from types import MappingProxyType, SimpleNamespace
+
+from core_framework.models import DeploymentDetails
+
+from core_codecommit import listener
+
+from tests._fixtures_data import START_BUILD_RESPONSE
+
+
+@pytest.fixture(scope="session")
+def start_build_response():
+    """
+    Sample CodeBuild start_build response shared by every test.
+
+    Only the top level is read-only; stubs queue a deep copy so the nested
+    build data is never handed to the listener.
+
+    :returns: start_build response with a read-only top level
+    :rtype: types.MappingProxyType
+    """
+    return START_BUILD_RESPONSE
+
+
+# Parameters the listener should send to SSM put_parameter.
+EXPECTED_PUT_PARAMETER = MappingProxyType(
+    {"Name": "/portfolio/my-repo/main/build_time", "Value": ANY, "Type": "String", "Overwrite": True}
+)
+
+# (name, value, type) of the environment overrides the listener should send to
+# CodeBuild. BUILD_NUMBER holds the default; tests may expect another value.
+EXPECTED_ENV_VARS = (
+    ("CLIENT", "test", "PLAINTEXT"),
+    ("PORTFOLIO", "portfolio", "PLAINTEXT"),
+    ("APP", "my-repo", "PLAINTEXT"),
+    ("BRANCH", "main", "PLAINTEXT"),
+    ("BUILD", "abcdef1", "PLAINTEXT"),
+    ("BUILD_NUMBER", "1", "PLAINTEXT"),
+    ("BUCKET_NAME", "test-core-automation-master", "PLAINTEXT"),
+)
+
+
+# Fields shared by every record in a CodeCommit trigger event.
+_RECORD_TEMPLATE = MappingProxyType(
+    {
+        "eventVersion": "1.0",
+        "eventSource": "aws:codecommit",
+        "awsRegion": "us-west-2",
+        "eventName": "ReferenceChanges",
+    }
+)
+
+# (repository, ref, commit) of each record in the multi-record event.
+MULTI_RECORD_SPECS = (
+    ("portfolio-my-repo", "refs/heads/main", "abcdef1234567890abcdef1234567890abcdef12"),
+    ("portfolio-another-repo", "refs/heads/develop", "fedcba0987654321fedcba0987654321fedcba09"),
+)
+
+
+def _make_record(repository, ref, commit):
+    """
+    Build a CodeCommit event record from the shared template.
+
+    :param repository: Repository name, {portfolio}-{app}
+    :type repository: str
+    :param ref: Git reference that was pushed
+    :type ref: str
+    :param commit: Full commit id
+    :type commit: str
+    :returns: CodeCommit event record
+    :rtype: dict
+    """
+    return {
+        **_RECORD_TEMPLATE,
+        "eventSourceARN": "arn:aws:codecommit:us-west-2:123456789012:{}".format(repository),
+        "codecommit": {"references": [{"ref": ref, "commit": commit}]},
+    }
+
+
+def _expected_env_vars(build_number):
+    """
+    Environment overrides the listener should send to CodeBuild.
+
+    :param build_number: Expected BUILD_NUMBER value
+    :type build_number: str
+    :returns: Expected environmentVariablesOverride list
+    :rtype: list
+    """
+    return [
+        {"name": name, "value": build_number if name == "BUILD_NUMBER" else value, "type": var_type}
+        for name, value, var_type in EXPECTED_ENV_VARS
+    ]
+
+
+def _stub_put_parameter(stubber, version=1):
+    """
+    Queue a successful SSM put_parameter response.
+
+    :param stubber: Stubber attached to the SSM client
+    :type stubber: Stubber
+    :param version: Parameter version to return
+    :type version: int
+    """
+    stubber.add_response("put_parameter", {"Version": version}, expected_params=dict(EXPECTED_PUT_PARAMETER))
+
+
+def _stub_start_build(stubber, response, build_number="1"):
+    """
+    Queue a successful CodeBuild start_build response.
+
+    :param stubber: Stubber attached to the CodeBuild client
+    :type stubber: Stubber
+    :param response: Response to return from start_build
+    :type response: Mapping
+    :param build_number: Expected BUILD_NUMBER environment override
+    :type build_number: str
+    """
+    stubber.add_response(
+        "start_build",
+        # Stubber validates responses as plain dicts; the deep copy keeps the
+        # nested build data from being shared with the listener.
+        copy.deepcopy(dict(response)),
+        expected_params={
+            "projectName": "portfolio-my-repo",
+            "sourceVersion": "main",
+            "environmentVariablesOverride": _expected_env_vars(build_number),
         },
+    )
+
+
+def _reset_listener_state():
+    """Clear the per-container caches held by the listener module."""
+    listener._get_region.cache_clear()
+    listener._get_bucket_name.cache_clear()
+    listener._get_ssm_client.cache_clear()
+    listener._get_codebuild_client.cache_clear()
+    listener._last_builds.clear()
+
+
+@pytest.fixture(scope="session")
+def aws_clients():
+    """
+    SSM and CodeBuild clients shared by every test in the session.
+
+    Loading the botocore service models dominates client construction, so the
+    clients are built once with dummy credentials and stubbed per test.
+
+    :returns: Clients keyed by service name
+    :rtype: dict
+    """
+    kwargs = {
+        "region_name": "us-west-2",
+        "aws_access_key_id": "testing",
+        "aws_secret_access_key": "testing",
     }
-}
-
-
-class MockAWSClient:
-    """Mock AWS client for testing CodeCommit listener functionality."""
-
-    def put_parameter(self, **kwargs):
-        """
-        Mock SSM put_parameter operation.
-
-        :param kwargs: Parameters for put_parameter call
-        :type kwargs: dict
-        :returns: Mock response with version number
-        :rtype: dict
-        """
-        param_name = kwargs.get("Name")
-        current_time = kwargs.get("Value")
-        param_type = kwargs.get("Type")  # Fixed: renamed from 'type' to avoid conflict
-        overwrite = kwargs.get("Overwrite")
-
-        assert param_name == "/portfolio/my-repo/main/build_time"
-        assert current_time is not None
-        assert param_type == "String"  # Fixed: use renamed variable
-        assert overwrite is True
-
-        return {"Version": 1}  # Fixed: return integer instead of string
-
-    def start_build(self, **kwargs):
-        """
-        Mock CodeBuild start_build operation.
-
-        :param kwargs: Parameters for start_build call
-        :type kwargs: dict
-        :returns: Mock CodeBuild response
-        :rtype: dict
-        """
-        project_name = kwargs.get("projectName")
-        source_version = kwargs.get("sourceVersion")
-        env_vars = kwargs.get("environmentVariablesOverride")
-
-        assert project_name == "portfolio-my-repo"
-        assert source_version == "main"
-        assert env_vars == [
-            {"name": "CLIENT", "value": "test", "type": "PLAINTEXT"},
-            {"name": "PORTFOLIO", "value": "portfolio", "type": "PLAINTEXT"},
-            {"name": "APP", "value": "my-repo", "type": "PLAINTEXT"},
-            {"name": "BRANCH", "value": "main", "type": "PLAINTEXT"},
-            {"name": "BUILD", "value": "abcdef1", "type": "PLAINTEXT"},
-            {
-                "name": "BUILD_NUMBER",
-                "value": "1",
-                "type": "PLAINTEXT",
-            },  # Fixed: expect string "1"
-            {
-                "name": "BUCKET_NAME",
-                "value": "test-core-automation-master",
-                "type": "PLAINTEXT",
-            },
-        ]
+    return {
+        "ssm": boto3.client("ssm", **kwargs),
+        "codebuild": boto3.client("codebuild", **kwargs),
+    }
+
+
+@pytest.fixture(autouse=True, scope="module")
+def patch_boto3_client(aws_clients):
+    """
+    Route the listener's boto3.client calls to the shared clients.
+
+    The patch is applied once for the module rather than per test.
+
+    :param aws_clients: Session-wide clients keyed by service name
+    :type aws_clients: dict
+    :yields: Client factory installed as boto3.client
+    :rtype: Callable
+    """
 
-        return start_build_response
+    # A single catch-all mock for unexpected services
+    default_client = MagicMock()
+
+    def client_factory(service_name, **kwargs):
+        """Factory function to return appropriate stubbed client."""
+        return aws_clients.get(service_name, default_client)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(listener.boto3, "client", client_factory)
+        yield client_factory
 
 
 @pytest.fixture
-def mock_boto3_clients():
+def mock_boto3_clients(aws_clients):
     """
-    Mock boto3.client calls for SSM and CodeBuild services.
+    Stub the SSM and CodeBuild clients used by the listener.
 
-    :yields: Mock client factory function
-    :rtype: MagicMock
+    The listener caches its clients, configuration lookups and build numbers
+    per container, so that state is cleared before and after each test to make
+    sure the stubbed clients are picked up. Every queued response must be
+    consumed by the test.
+
+    :param aws_clients: Session-wide clients keyed by service name
+    :type aws_clients: dict
+    :yields: Stubbers keyed by service name
+    :rtype: dict
     """
+    stubbers = {name: Stubber(client) for name, client in aws_clients.items()}
+
+    _reset_listener_state()
+    for stubber in stubbers.values():
+        stubber.activate()
+    try:
+        yield stubbers
+        for stubber in stubbers.values():
+            stubber.assert_no_pending_responses()
+    finally:
+        for stubber in stubbers.values():
+            stubber.deactivate()
+        _reset_listener_state()
 
-    def client_factory(service_name, **kwargs):
-        """Factory function to return appropriate mock client."""
-        if service_name in ["ssm", "codebuild"]:
-            return MockAWSClient()
-        else:
-            # Return a default mock for unexpected services
-            return MagicMock()
 
-    with patch("boto3.client", side_effect=client_factory) as mock_client:
-        yield mock_client
+# 2009-02-13T23:31:30.123Z, i.e. 1234567890123 ms since the epoch.
+FROZEN_TIME = dt.datetime(2009, 2, 13, 23, 31, 30, 123000, tzinfo=dt.timezone.utc)
 
 
 @pytest.fixture
 def mock_time():
     """
-    Mock time.time() to return a predictable timestamp.
+    Freeze the clock at a predictable timestamp.
 
-    :yields: Mock time function
-    :rtype: MagicMock
+    The destination is a datetime so the frozen time is exact to the
+    millisecond (1234567890123 ms); a float timestamp would carry float
+    rounding into time.time_ns().
+
+    :yields: Time traveller holding the frozen time
+    :rtype: time_machine.Coordinates
     """
-    with patch("time.time", return_value=1234567890.123) as mock_time_func:
-        yield mock_time_func
+    with time_machine.travel(FROZEN_TIME, tick=False) as traveller:
+        yield traveller
 
 
 @pytest.fixture
@@ -167,26 +267,48 @@ def mock_util_functions():
 
 
 @pytest.fixture
-def mock_deployment_details():
+def deployment_details_instance():
+    """
+    Lightweight stand-in for a DeploymentDetails instance, built fresh for each test.
+
+    The listener only reads these attributes and calls get_identity, so a
+    SimpleNamespace is enough.
+
+    :returns: DeploymentDetails stand-in with fixed attributes
+    :rtype: types.SimpleNamespace
+    """
+    return SimpleNamespace(
+        portfolio="portfolio",
+        app="my-repo",
+        branch="main",
+        build="abcdef1",
+        branch_short_name="main",
+        client="test",
+        get_identity=lambda: "prn:portfolio:my-repo:main:abcdef1",
+    )
+
+
+@pytest.fixture
+def mock_deployment_details(deployment_details_instance, monkeypatch):
     """
     Mock DeploymentDetails to provide client information.
 
-    :yields: Mock deployment details
+    The class mock records the keyword arguments the listener builds from the
+    event record, so tests can assert on the parsed portfolio, app, branch and
+    build. Pydantic models accept any keyword arguments, so the autospec does
+    not validate them.
+
+    :param deployment_details_instance: DeploymentDetails stand-in
+    :type deployment_details_instance: types.SimpleNamespace
+    :param monkeypatch: Pytest monkeypatch fixture
+    :type monkeypatch: pytest.MonkeyPatch
+    :returns: Mock deployment details class
     :rtype: MagicMock
     """
-    with patch("core_codecommit.listener.DeploymentDetails") as mock_dd:
-        # Create a mock instance with the required attributes
-        mock_instance = MagicMock()
-        mock_instance.portfolio = "portfolio"
-        mock_instance.app = "my-repo"
-        mock_instance.branch = "main"
-        mock_instance.build = "abcdef1"
-        mock_instance.branch_short_name = "main"
-        mock_instance.client = "test"  # Fixed: provide client attribute
-
-        # Configure the mock to return our instance
-        mock_dd.return_value = mock_instance
-        yield mock_dd
+    mock_dd = create_autospec(DeploymentDetails)
+    mock_dd.return_value = deployment_details_instance
+    monkeypatch.setattr("core_codecommit.listener.DeploymentDetails", mock_dd)
+    return mock_dd
 
 
 @pytest.fixture
@@ -194,6 +316,9 @@ def codecommit_event():
     """
     Sample CodeCommit event for testing.
 
+    The event is built fresh for each test, so a test that changes it does not
+    affect the others.
+
     :returns: Mock CodeCommit event structure
     :rtype: dict
     """
@@ -222,31 +347,45 @@ def codecommit_event():
     }
 
 
+@pytest.mark.parametrize("version, build_number", [(1, "1"), (42, "42")])
 def test_codecommit_listener_success(
+    version,
+    build_number,
     mock_boto3_clients,
     mock_time,
     mock_util_functions,
     mock_deployment_details,
     codecommit_event,
+    start_build_response,
 ):
     """
     Test successful processing of CodeCommit event.
 
     Verifies that the handler correctly processes a CodeCommit event,
-    extracts deployment details, and triggers the appropriate CodeBuild project.
-
-    :param mock_boto3_clients: Mocked boto3 client factory
-    :type mock_boto3_clients: MagicMock
-    :param mock_time: Mocked time function
-    :type mock_time: MagicMock
+    extracts deployment details, and triggers the appropriate CodeBuild project
+    with the parameter version as its BUILD_NUMBER.
+
+    :param version: Parameter version returned by put_parameter
+    :type version: int
+    :param build_number: Expected BUILD_NUMBER environment override
+    :type build_number: str
+    :param mock_boto3_clients: Stubbers for the SSM and CodeBuild clients
+    :type mock_boto3_clients: dict
+    :param mock_time: Frozen clock
+    :type mock_time: time_machine.Coordinates
     :param mock_util_functions: Mocked utility functions
     :type mock_util_functions: dict
     :param mock_deployment_details: Mocked DeploymentDetails class
     :type mock_deployment_details: MagicMock
     :param codecommit_event: Sample CodeCommit event
     :type codecommit_event: dict
+    :param start_build_response: Sample start_build response
+    :type start_build_response: types.MappingProxyType
     """
-    response = handler(codecommit_event, None)
+    _stub_put_parameter(mock_boto3_clients["ssm"], version=version)
+    _stub_start_build(mock_boto3_clients["codebuild"], start_build_response, build_number=build_number)
+
+    response = listener.handler(codecommit_event, None)
 
     # Verify response structure
     assert response is not None
@@ -259,6 +398,39 @@ def test_codecommit_listener_success(
     assert build_response["build"]["buildStatus"] == "IN_PROGRESS"
     assert build_response["build"]["id"] == "my-build-id"
 
+    mock_deployment_details.assert_called_once_with(Portfolio="portfolio", App="my-repo", Branch="main", Build="abcdef1")
+
+
+@pytest.mark.parametrize(
+    "repository, ref, expected",
+    [
+        ("core-api-gateway", "refs/heads/main", {"Portfolio": "core", "App": "api-gateway", "Branch": "main"}),
+        ("core", "refs/heads/main", {"Portfolio": "core", "App": "", "Branch": "main"}),
+        ("core-api", "refs/heads/feature/x", {"Portfolio": "core", "App": "api", "Branch": "x"}),
+    ],
+)
+def test_get_deployment_details_parses_record(repository, ref, expected, mock_deployment_details):
+    """
+    Test that the repository name and ref are split into deployment details.
+
+    The portfolio is everything before the first dash of the repository name,
+    the app is the rest, and the branch is the last segment of the ref.
+
+    :param repository: Repository name in the event source ARN
+    :type repository: str
+    :param ref: Git reference that was pushed
+    :type ref: str
+    :param expected: Expected Portfolio, App and Branch arguments
+    :type expected: dict
+    :param mock_deployment_details: Mocked DeploymentDetails class
+    :type mock_deployment_details: MagicMock
+    """
+    record = _make_record(repository, ref, "abcdef1234567890abcdef1234567890abcdef12")
+
+    listener.__get_deployment_details(record)
+
+    mock_deployment_details.assert_called_once_with(**expected, Build="abcdef1")
+
 
 def test_codecommit_listener_missing_records():
     """
@@ -270,7 +442,7 @@ def test_codecommit_listener_missing_records():
     invalid_event = {"NotRecords": []}
 
     with pytest.raises(ValueError, match="No 'Records' key in event"):
-        handler(invalid_event, None)
+        listener.handler(invalid_event, None)
 
 
 def test_codecommit_listener_empty_records():
@@ -282,62 +454,212 @@ def test_codecommit_listener_empty_records():
     """
     empty_event = {"Records": []}
 
-    response = handler(empty_event, None)
+    response = listener.handler(empty_event, None)
 
     assert response is not None
     assert "Responses" in response
     assert len(response["Responses"]) == 0
 
 
-def test_codecommit_listener_multiple_records(mock_boto3_clients, mock_time, mock_util_functions, mock_deployment_details):
+def test_codecommit_listener_multiple_records(
+    aws_clients,
+    mock_boto3_clients,
+    mock_time,
+    mock_util_functions,
+    mock_deployment_details,
+):
     """
     Test processing of multiple CodeCommit records in single event.
 
-    Verifies that the handler can process multiple repository commits
-    in a single event and returns responses for each.
-
-    :param mock_boto3_clients: Mocked boto3 client factory
-    :type mock_boto3_clients: MagicMock
-    :param mock_time: Mocked time function
-    :type mock_time: MagicMock
+    Verifies that records for different commits each start their own build
+    on the thread pool, and that every response lines up with its record.
+    The client calls are patched rather than stubbed because the Stubber
+    hands out queued responses in call order, which the pool does not fix.
+
+    :param aws_clients: Session-wide clients keyed by service name
+    :type aws_clients: dict
+    :param mock_boto3_clients: Stubbers for the SSM and CodeBuild clients
+    :type mock_boto3_clients: dict
+    :param mock_time: Frozen clock
+    :type mock_time: time_machine.Coordinates
     :param mock_util_functions: Mocked utility functions
     :type mock_util_functions: dict
     :param mock_deployment_details: Mocked DeploymentDetails class
     :type mock_deployment_details: MagicMock
     """
-    multi_record_event = {
-        "Records": [
-            {
-                "eventSourceARN": "arn:aws:codecommit:us-west-2:123456789012:portfolio-my-repo",
-                "codecommit": {
-                    "references": [
-                        {
-                            "ref": "refs/heads/main",
-                            "commit": "abcdef1234567890abcdef1234567890abcdef12",
-                        }
-                    ]
-                },
-            },
-            {
-                "eventSourceARN": "arn:aws:codecommit:us-west-2:123456789012:portfolio-another-repo",
-                "codecommit": {
-                    "references": [
-                        {
-                            "ref": "refs/heads/develop",
-                            "commit": "fedcba0987654321fedcba0987654321fedcba09",
-                        }
-                    ]
-                },
-            },
-        ]
+    multi_record_event = {"Records": [_make_record(*spec) for spec in MULTI_RECORD_SPECS]}
+
+    # One deployment per record, built from what the listener parsed.
+    mock_deployment_details.side_effect = lambda Portfolio, App, Branch, Build: SimpleNamespace(
+        portfolio=Portfolio,
+        app=App,
+        branch=Branch,
+        build=Build,
+        branch_short_name=Branch,
+        client="test",
+        get_identity=lambda: "prn:{}:{}:{}:{}".format(Portfolio, App, Branch, Build),
+    )
+
+    # Parameter version returned for each record's build_time parameter.
+    versions = {
+        "/portfolio/my-repo/main/build_time": 7,
+        "/portfolio/another-repo/develop/build_time": 3,
     }
 
-    response = handler(multi_record_event, None)
+    def put_parameter(**kwargs):
+        """Return the version for the parameter that was written."""
+        return {"Version": versions[kwargs["Name"]]}
 
-    assert response is not None
-    assert "Responses" in response
-    assert len(response["Responses"]) == 2
+    def start_build(**kwargs):
+        """Return a build identified by the project and branch it was started for."""
+        return {"build": {"id": "{}:{}".format(kwargs["projectName"], kwargs["sourceVersion"]), "buildStatus": "IN_PROGRESS"}}
+
+    with (
+        patch.object(aws_clients["ssm"], "put_parameter", side_effect=put_parameter) as mock_put_parameter,
+        patch.object(aws_clients["codebuild"], "start_build", side_effect=start_build) as mock_start_build,
+    ):
+        response = listener.handler(multi_record_event, None)
+
+    assert [r["build"]["id"] for r in response["Responses"]] == [
+        "portfolio-my-repo:main",
+        "portfolio-another-repo:develop",
+    ]
+
+    assert sorted(c.kwargs["Name"] for c in mock_put_parameter.call_args_list) == sorted(versions)
+
+    # The records run concurrently, so the calls are compared by project.
+    builds = {c.kwargs["projectName"]: c.kwargs for c in mock_start_build.call_args_list}
+    assert mock_start_build.call_count == len(builds) == 2
+    for project_name, branch, build, build_number in [
+        ("portfolio-my-repo", "main", "abcdef1", "7"),
+        ("portfolio-another-repo", "develop", "fedcba0", "3"),
+    ]:
+        kwargs = builds[project_name]
+        env = {e["name"]: e["value"] for e in kwargs["environmentVariablesOverride"]}
+        assert kwargs["sourceVersion"] == branch
+        assert (env["BRANCH"], env["BUILD"], env["BUILD_NUMBER"]) == (branch, build, build_number)
 
-    # Verify each response has the expected structure
-    for build_response in response["Responses"]:
-        assert build_response["build"]["buildStatus"] == "IN_PROGRESS"
+
+def test_codecommit_listener_retriggered_commit_reuses_build(
+    mock_boto3_clients,
+    mock_time,
+    mock_util_functions,
+    mock_deployment_details,
+    codecommit_event,
+    start_build_response,
+):
+    """
+    Test that a commit re-triggered within the reuse window starts no second build.
+
+    The re-trigger writes no new build number and starts no build; it gets
+    the response of the build already started for the commit.
+
+    :param mock_boto3_clients: Stubbers for the SSM and CodeBuild clients
+    :type mock_boto3_clients: dict
+    :param mock_time: Frozen clock
+    :type mock_time: time_machine.Coordinates
+    :param mock_util_functions: Mocked utility functions
+    :type mock_util_functions: dict
+    :param mock_deployment_details: Mocked DeploymentDetails class
+    :type mock_deployment_details: MagicMock
+    :param codecommit_event: Sample CodeCommit event
+    :type codecommit_event: dict
+    :param start_build_response: Sample start_build response
+    :type start_build_response: types.MappingProxyType
+    """
+    # Only one call of each is queued; a second call would fail the stub.
+    _stub_put_parameter(mock_boto3_clients["ssm"])
+    _stub_start_build(mock_boto3_clients["codebuild"], start_build_response)
+
+    first = listener.handler(codecommit_event, None)
+    second = listener.handler(codecommit_event, None)
+
+    assert second["Responses"][0] is first["Responses"][0]
+
+
+@pytest.mark.parametrize(
+    "error_code, throttled",
+    [
+        ("ThrottlingException", True),
+        ("TooManyUpdates", True),
+        ("AccessDeniedException", False),
+    ],
+)
+def test_codecommit_listener_put_parameter_error_is_raised(
+    error_code,
+    throttled,
+    mock_boto3_clients,
+    mock_time,
+    mock_util_functions,
+    mock_deployment_details,
+    codecommit_event,
+):
+    """
+    Test that a failed PutParameter is re-raised without starting a build.
+
+    Throttling errors are logged as a warning first so the invocation retry
+    can be told apart from a real failure.
+
+    :param error_code: Error code returned by put_parameter
+    :type error_code: str
+    :param throttled: Whether the error code is a throttling error
+    :type throttled: bool
+    :param mock_boto3_clients: Stubbers for the SSM and CodeBuild clients
+    :type mock_boto3_clients: dict
+    :param mock_time: Frozen clock
+    :type mock_time: time_machine.Coordinates
+    :param mock_util_functions: Mocked utility functions
+    :type mock_util_functions: dict
+    :param mock_deployment_details: Mocked DeploymentDetails class
+    :type mock_deployment_details: MagicMock
+    :param codecommit_event: Sample CodeCommit event
+    :type codecommit_event: dict
+    """
+    # No start_build is queued; starting a build would fail the stub.
+    mock_boto3_clients["ssm"].add_client_error("put_parameter", service_error_code=error_code)
+
+    with patch.object(listener.log, "warn") as mock_warn:
+        with pytest.raises(ClientError) as exc_info:
+            listener.handler(codecommit_event, None)
+
+    assert exc_info.value.response["Error"]["Code"] == error_code
+    assert mock_warn.called is throttled
+
+
+def test_codecommit_listener_duplicate_records_start_one_build(
+    mock_boto3_clients,
+    mock_time,
+    mock_util_functions,
+    mock_deployment_details,
+    codecommit_event,
+    start_build_response,
+):
+    """
+    Test that records for the same commit start a single build.
+
+    Every record still receives a response so the response list matches the
+    records in the event.
+
+    :param mock_boto3_clients: Stubbers for the SSM and CodeBuild clients
+    :type mock_boto3_clients: dict
+    :param mock_time: Frozen clock
+    :type mock_time: time_machine.Coordinates
+    :param mock_util_functions: Mocked utility functions
+    :type mock_util_functions: dict
+    :param mock_deployment_details: Mocked DeploymentDetails class
+    :type mock_deployment_details: MagicMock
+    :param codecommit_event: Sample CodeCommit event
+    :type codecommit_event: dict
+    :param start_build_response: Sample start_build response
+    :type start_build_response: types.MappingProxyType
+    """
+    record = codecommit_event["Records"][0]
+    duplicate_event = {"Records": [record, record]}
+
+    _stub_put_parameter(mock_boto3_clients["ssm"])
+    _stub_start_build(mock_boto3_clients["codebuild"], start_build_response)
+
+    response = listener.handler(duplicate_event, None)
+
+    assert len(response["Responses"]) == 2
+    assert response["Responses"][0] is response["Responses"][1]